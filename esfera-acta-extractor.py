@@ -1,5 +1,6 @@
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor
 
 from src.conversion_service import convert_input_directory
 
@@ -44,15 +45,28 @@ def main() -> None:
         # Imported lazily so the CLI can finish the extraction phase even if summary
         # generation changes its dependencies later.
         from src.summary_generator import generate_summary_report 
+        summary_jobs = []
         for source_xlsx_file in actual_source_xlsx_files:
             summary_file_name = f"qualificacions_MP-{os.path.basename(source_xlsx_file)}"
             # summary_output_dir is '03_final_grade_summaries', defined above
             output_summary_path = os.path.join(summary_output_dir, summary_file_name)
-            try:
-                generate_summary_report(source_xlsx_file, output_summary_path)
-                print(f"\t- Successfully generated summary: {output_summary_path}")
-            except Exception as e:
-                print(f"ERROR generating summary for {source_xlsx_file}: {str(e)}")
+            summary_jobs.append((source_xlsx_file, output_summary_path))
+
+        # Every summary reads and writes its own files, so they are generated in
+        # separate processes. Results are reported in the original file order.
+        max_workers = min(len(summary_jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (executor.submit(generate_summary_report, source_xlsx_file, output_summary_path),
+                 source_xlsx_file, output_summary_path)
+                for source_xlsx_file, output_summary_path in summary_jobs
+            ]
+            for future, source_xlsx_file, output_summary_path in futures:
+                try:
+                    future.result()
+                    print(f"\t- Successfully generated summary: {output_summary_path}")
+                except Exception as e:
+                    print(f"ERROR generating summary for {source_xlsx_file}: {str(e)}")
 
 
 if __name__ == '__main__':
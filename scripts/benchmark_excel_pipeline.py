@@ -37,9 +37,13 @@ def _normalize_header(header: object) -> str:
 
 def _parse_sample_workbook(sample_workbook: Path) -> tuple[list[str], list[str], dict[str, str], list[str]]:
     """Infer MP/RA/EM structure from a real workbook so the benchmark stays realistic."""
-    wb = load_workbook(sample_workbook)
-    ws = wb.active
-    headers = [_normalize_header(ws.cell(row=1, column=index).value) for index in range(1, ws.max_column + 1)]
+    # Only the header row is needed, so read-only mode avoids building every cell object.
+    wb = load_workbook(sample_workbook, read_only=True, keep_links=False)
+    try:
+        header_row = next(wb.active.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    headers = [_normalize_header(value) for value in header_row]
 
     ra_headers: list[str] = []
     mp_codes: list[str] = []
@@ -14,22 +14,24 @@ from openpyxl import load_workbook
 
 def compare_workbooks(left_path: Path, right_path: Path, diff_limit: int) -> dict[str, object]:
     """Compare the first worksheet of two exported workbooks for regression checks."""
-    left_wb = load_workbook(left_path)
-    right_wb = load_workbook(right_path)
+    left_wb = load_workbook(left_path, keep_links=False)
+    right_wb = load_workbook(right_path, keep_links=False)
     left_ws = left_wb.active
     right_ws = right_wb.active
 
-    header_left = [left_ws.cell(row=1, column=index).value for index in range(1, left_ws.max_column + 1)]
-    header_right = [right_ws.cell(row=1, column=index).value for index in range(1, right_ws.max_column + 1)]
+    header_left = list(next(left_ws.iter_rows(min_row=1, max_row=1, values_only=True), ()))
+    header_right = list(next(right_ws.iter_rows(min_row=1, max_row=1, values_only=True), ()))
 
     diffs: list[dict[str, object]] = []
     max_row = max(left_ws.max_row, right_ws.max_row)
     max_col = max(left_ws.max_column, right_ws.max_column)
+    # Both sheets are walked once as value rows padded to the larger shape, so missing
+    # cells on either side read as None.
+    left_rows = left_ws.iter_rows(max_row=max_row, max_col=max_col, values_only=True)
+    right_rows = right_ws.iter_rows(max_row=max_row, max_col=max_col, values_only=True)
     # Stop after diff_limit mismatches so the output stays readable during quick checks.
-    for row in range(1, max_row + 1):
-        for col in range(1, max_col + 1):
-            left_value = left_ws.cell(row=row, column=col).value
-            right_value = right_ws.cell(row=row, column=col).value
+    for row, (left_values, right_values) in enumerate(zip(left_rows, right_rows), start=1):
+        for col, (left_value, right_value) in enumerate(zip(left_values, right_values), start=1):
             if left_value != right_value:
                 diffs.append(
                     {
@@ -138,16 +138,12 @@ def convert_pdf_to_excel(
         # pivot the long-form records back into a wide table at the end of parsing.
         wide = combined_records.pivot(index="estudiant", columns="code", values="grade")
         wide = wide.reindex(student_order)
-        for col in wide.columns:
-            if col != "estudiant":
-                # Excel should receive numbers as numbers so conditional formatting works,
-                # but status markers like PDT or EP must remain as text.
-                str_series = wide[col].astype(str)
-                numeric_series = pd.to_numeric(wide[col], errors="coerce")
-                wide[col] = numeric_series.combine(
-                    str_series,
-                    lambda x, y: x if pd.notna(x) else (y if y != "nan" else ""),
-                )
+        # Excel should receive numbers as numbers so conditional formatting works,
+        # but status markers like PDT or EP must remain as text. The whole frame is
+        # coerced at once and text only fills the cells that are not numeric.
+        numeric = wide.apply(pd.to_numeric, errors="coerce")
+        text = wide.astype(str).replace("nan", "")
+        wide = numeric.where(numeric.notna(), text)
 
         wide = wide.reset_index()
 
@@ -2,20 +2,55 @@
 Excel processing module for generating and formatting grade reports.
 """
 
+from __future__ import annotations
+
 import json
 from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.worksheet.dimensions import ColumnDimension
 from openpyxl.utils import get_column_letter
-from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
-from openpyxl.formatting.rule import FormulaRule
-from typing import Optional
-
+from openpyxl.styles import PatternFill, Font, Alignment
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from .excel_styles import (
+    BOLD_FONT,
+    CENTER_WRAPPED,
+    LEFT_ALIGNED,
+    LEFT_WRAPPED,
+    NO_FILL,
+    THIN_BORDER,
+    apply_style_template,
+    style_template,
+)
 from .perf_timing import TimingRecorder
 
+if TYPE_CHECKING:
+    # Only needed for annotations; the module is private to openpyxl.
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+
+# Styles only the Acta export uses; the common ones live in excel_styles.
+_WHITE_BOLD_FONT = Font(bold=True, color='FFFFFF')
+_LEGEND_LABEL_ALIGNED = Alignment(wrap_text=True, vertical='center')
+
+_GRAY_FILL = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+_TYPE_A_FILL = PatternFill(start_color="F1C232", end_color="F1C232", fill_type="solid")
+_TYPE_B_FILL = PatternFill(start_color="B4A7D6", end_color="B4A7D6", fill_type="solid")
+_ACTA_EVEN_FILL = PatternFill(start_color="D9EAD3", end_color="D9EAD3", fill_type="solid")
+_ACTA_ODD_FILL = PatternFill(start_color="B6D7A8", end_color="B6D7A8", fill_type="solid")
+_SUMMARY_HEADER_FILL = PatternFill(start_color='1C4587', end_color='1C4587', fill_type='solid')
+_SUMMARY_EVEN_FILL = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
+_SUMMARY_ODD_FILL = PatternFill(start_color='EEF6FF', end_color='EEF6FF', fill_type='solid')
+
+_REVIEW_FILL = PatternFill(start_color="FFE6CC", end_color="FFE6CC", fill_type="solid")
+_MISSING_FILL = PatternFill(start_color="FFD9D9", end_color="FFD9D9", fill_type="solid")
+_FAILING_FONT = Font(color="FF0000")
+
 
 @lru_cache(maxsize=1)
 def _load_mp_name_lookup() -> dict[str, str]:
@@ -40,30 +75,6 @@ def _format_mp_display_name(mp_code: str) -> str:
     return mp_code
 
 
-def apply_row_formatting(
-    workbook_path: str,
-    mp_codes_with_em: list[str],
-    mp_codes: list[str],
-) -> None:
-    """Apply the visual layout that staff expects in the exported workbook."""
-    wb = load_workbook(workbook_path)
-    ws = wb.active
-    _apply_row_formatting_to_sheet(ws, mp_codes_with_em, mp_codes)
-    wb.save(workbook_path)
-
-def apply_conditional_formatting(
-    workbook_path: str,
-    mp_groups: dict[str, list[str]],
-    mp_codes_with_em: list[str],
-    mp_codes: list[str],
-) -> None:
-    """Highlight values that need review, such as missing grades or failing marks."""
-    wb = load_workbook(workbook_path)
-    ws = wb.active
-    _apply_conditional_formatting_to_sheet(ws, mp_groups, mp_codes_with_em, mp_codes)
-    wb.save(workbook_path)
-
-
 def export_excel_with_spacing(
     df: pd.DataFrame,
     output_path: str,
@@ -79,30 +90,22 @@ def export_excel_with_spacing(
     # MP grade columns are renamed to the short MP code, while detailed RA/EM columns
     # keep their full identifier so the final workbook remains understandable.
     with timings.measure("prepare_export_dataframe"):
-        non_mp_columns = [col for col in df.columns
-                             if col.endswith(('EM', 'RA')) or col == 'estudiant']
+        # Frozen once here and shared by every helper, which only test membership.
+        mp_codes_with_em_set = frozenset(mp_codes_with_em)
+        non_mp_columns = {col for col in df.columns
+                             if col.endswith(('EM', 'RA')) or col == 'estudiant'}
         df = df.rename(columns=lambda col: col.split('_')[0] if col not in non_mp_columns else col)
-        mp_grade_columns = [col for col in df.columns if not col.endswith('EM') and
-                             not col.endswith('RA') and col != 'estudiant']
-        df_without_mp_grades = df[non_mp_columns].copy()
 
-        ra_codes = [col for col in df_without_mp_grades.columns if col.endswith('RA')]
+        ra_codes = [col for col in df.columns if col.endswith('RA')]
 
-        mp_groups = {mp: [] for mp in mp_codes}
-        sorted_mp_codes = sorted(mp_codes, key=len, reverse=True)
-        for ra_code in ra_codes:
-            for mp_code in sorted_mp_codes:
-                if ra_code.startswith(mp_code + '_'):
-                    mp_groups[mp_code].append(ra_code)
-                    break
+        mp_groups = _group_ra_codes_by_mp(ra_codes, mp_codes)
 
         new_columns = ['estudiant']
         for mp_code in mp_codes:
             # Keep RA columns grouped under their parent MP so the final workbook reads
             # left-to-right the way staff expect when reviewing one module at a time.
-            for ra in mp_groups[mp_code]:
-                new_columns.append(ra)
-            if mp_code in mp_codes_with_em:
+            new_columns.extend(mp_groups[mp_code])
+            if mp_code in mp_codes_with_em_set:
                 new_columns.extend([
                     f'{mp_code} CENTRE',
                     f'{mp_code} EMPRESA',
@@ -111,43 +114,49 @@ def export_excel_with_spacing(
             else:
                 new_columns.append(f'{mp_code}')
 
-        em_to_mp = {}
-        for mp_code in mp_codes_with_em:
-            em_codes = [col for col in df_without_mp_grades.columns if col.startswith(f'{mp_code}_') and col.endswith('EM')]
-            for em_code in em_codes:
-                em_to_mp[em_code] = mp_code
-
-        export_df = df_without_mp_grades.reindex(columns=new_columns)
-        for em_code, mp_code in em_to_mp.items():
-            empresa_header = f'{mp_code} EMPRESA'
-            if empresa_header in export_df.columns and em_code in df_without_mp_grades.columns:
-                export_df[empresa_header] = df_without_mp_grades[em_code]
-
-        for mp_code in mp_grade_columns:
-            if mp_code in export_df.columns:
-                export_df[mp_code] = df[mp_code]
-
-        export_df = _blank_literal_na(export_df)
-        object_columns = export_df.select_dtypes(include=['object', 'string']).columns
-        if len(object_columns) > 0:
-            export_df[object_columns] = export_df[object_columns].fillna("")
-
-        # Add sequential index column
-        export_df.insert(0, '#', range(1, len(export_df) + 1))
+        # Company-placement grades arrive as EM columns but are shown under the
+        # "<MP> EMPRESA" header. CENTRE columns have no source and stay blank.
+        column_sources = {col: col for col in df.columns}
+        for em_code in df.columns:
+            if not em_code.endswith('EM'):
+                continue
+            mp_code = _parent_mp_code(em_code)
+            if mp_code in mp_codes_with_em_set:
+                column_sources[f'{mp_code} EMPRESA'] = em_code
+
+        # Build the final frame, sequential "#" column included, in one allocation
+        # instead of reindexing a copy and then inserting or assigning columns one by one.
+        blank_column = pd.Series(index=df.index, dtype='float64')
+        export_columns = {'#': range(1, len(df) + 1)}
+        export_columns.update(
+            (col, df[column_sources[col]] if col in column_sources else blank_column)
+            for col in new_columns
+        )
+        export_df = _blank_text_cells(pd.DataFrame(export_columns, index=df.index))
 
     output_path = output_path.replace('.csv', '.xlsx')
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        with timings.measure("initial_to_excel"):
-            export_df.to_excel(writer, index=False)
-        ws = writer.sheets[next(iter(writer.sheets))]
-        ws.title = 'Acta'
-        with timings.measure("apply_row_formatting"):
-            _apply_row_formatting_to_sheet(ws, mp_codes_with_em, mp_codes)
-        with timings.measure("apply_conditional_formatting"):
-            _apply_conditional_formatting_to_sheet(ws, mp_groups, mp_codes_with_em, mp_codes)
-        if include_summary_sheet:
-            with timings.measure("append_summary_sheet"):
-                _append_pending_ra_summary_sheet(writer, df)
+    # Write-only mode streams rows straight to the file instead of holding a full cell
+    # grid in memory, so all formatting is applied as the rows are emitted.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Acta')
+    # Column letters are resolved once and shared by the sheet layout and the rules.
+    header_lookup = _build_header_lookup(export_df.columns.tolist())
+    with timings.measure("write_acta_sheet"):
+        write_acta_sheet(ws, export_df, mp_groups, mp_codes_with_em_set, header_lookup)
+    with timings.measure("apply_conditional_formatting"):
+        apply_conditional_formatting(
+            ws,
+            mp_groups,
+            mp_codes_with_em_set,
+            mp_codes,
+            header_lookup,
+            last_student_row=len(export_df) + 1,
+        )
+    if include_summary_sheet:
+        with timings.measure("append_summary_sheet"):
+            _append_pending_ra_summary_sheet(wb, df)
+    with timings.measure("save_workbook"):
+        wb.save(output_path)
 
     timings.log(
         output_path=output_path,
@@ -156,31 +165,45 @@ def export_excel_with_spacing(
         mp_count=len(mp_codes),
         mp_with_em_count=len(mp_codes_with_em),
     )
-    print(f"\t- Exported {len(export_df)} entries to {output_path}")
 
 
-def _blank_literal_na(df: pd.DataFrame) -> pd.DataFrame:
-    """Clear text cells containing the literal marker 'NA' before exporting to Excel."""
-    cleaned_df = df.copy()
-    object_columns = cleaned_df.select_dtypes(include=['object', 'string']).columns
+def _parent_mp_code(code: str) -> str:
+    """Return the MP code an RA or EM column belongs to."""
+    # MP codes never contain an underscore (extract_mp_codes splits on the first one),
+    # so the parent MP is always the text before the first underscore.
+    return code.split('_', 1)[0]
+
+
+def _group_ra_codes_by_mp(ra_codes: list[str], mp_codes: list[str]) -> dict[str, list[str]]:
+    """Group RA columns under their parent MP, skipping RAs of unknown MPs."""
+    mp_groups: dict[str, list[str]] = {mp: [] for mp in mp_codes}
+    for ra_code in ra_codes:
+        mp_code = _parent_mp_code(ra_code)
+        if mp_code in mp_groups:
+            mp_groups[mp_code].append(ra_code)
+    return mp_groups
+
+
+def _blank_text_cells(df: pd.DataFrame) -> pd.DataFrame:
+    """Clear missing text cells and those holding the literal marker 'NA', in place."""
+    object_columns = df.select_dtypes(include=['object', 'string']).columns
     if len(object_columns) > 0:
-        cleaned_df[object_columns] = cleaned_df[object_columns].replace(
+        df[object_columns] = df[object_columns].replace(
             to_replace=r'^\s*NA\s*$',
             value='',
             regex=True,
-        )
-    return cleaned_df
+        ).fillna("")
+    return df
 
 
 def _append_pending_ra_summary_sheet(
-    writer: pd.ExcelWriter,
+    wb: Workbook,
     detailed_df: pd.DataFrame,
 ) -> None:
     """Append a teacher-facing worksheet listing pending RAs by student."""
     summary_df = build_pending_ra_summary_dataframe(detailed_df)
-    summary_df.to_excel(writer, index=False, sheet_name='Resum')
-    ws = writer.sheets['Resum']
-    _apply_pending_ra_summary_formatting(ws, len(summary_df))
+    ws = wb.create_sheet('Resum')
+    _write_pending_ra_summary_sheet(ws, summary_df)
 
 
 def build_pending_ra_summary_dataframe(detailed_df: pd.DataFrame) -> pd.DataFrame:
@@ -262,268 +285,287 @@ def _format_ra_display_code(ra_code: str) -> str:
 
 def _format_ra_header(header: str) -> str:
     """Break long RA headers over two lines so they stay readable in narrow columns."""
-    if not header or header.count('_') < 2:
+    parts = header.split('_', 2) if header else []
+    if len(parts) < 3:
         return header
-    first = header.find('_')
-    second = header.find('_', first + 1)
-    return f"{header[:second + 1]}\n{header[second + 1:]}"
-
-
-def _get_mp_for_ra(ra_header: str, mp_codes: list[str]) -> Optional[str]:
-    """Map an RA column back to its MP so the correct color can be reused."""
-    for mp_code in mp_codes:
-        if ra_header.startswith(mp_code + "_") and ra_header.endswith("RA"):
-            return mp_code
-    return None
-
+    return f"{parts[0]}_{parts[1]}_\n{parts[2]}"
 
-def _build_header_lookup(ws: Worksheet) -> dict[str, str]:
-    """Map visible header text back to Excel column letters."""
-    header_lookup: dict[str, str] = {}
-    for cell in ws[1]:
-        if cell.value is None:
-            continue
-        header_lookup[str(cell.value).replace('\n', '').strip()] = get_column_letter(cell.column)
-    return header_lookup
 
+def _build_header_kinds(
+    mp_groups: dict[str, list[str]],
+    mp_codes_with_em: frozenset[str],
+) -> dict[str, tuple[str, str]]:
+    """
+    Map every MP, CENTRE/EMPRESA and RA export header to its kind and parent MP.
 
-def _apply_row_formatting_to_sheet(
-    ws: Worksheet,
-    mp_codes_with_em: list[str],
-    mp_codes: list[str],
+    Kinds are 'mp', 'mp_split' (the CENTRE/EMPRESA columns of MPs with a company
+    placement) and 'ra'. Headers missing from the map are plain columns.
+    """
+    header_kinds: dict[str, tuple[str, str]] = {}
+    for mp_code, ra_codes in mp_groups.items():
+        header_kinds[mp_code] = ('mp', mp_code)
+        for ra_code in ra_codes:
+            header_kinds[ra_code] = ('ra', mp_code)
+    for mp_code in mp_codes_with_em:
+        header_kinds[f'{mp_code} CENTRE'] = ('mp_split', mp_code)
+        header_kinds[f'{mp_code} EMPRESA'] = ('mp_split', mp_code)
+    return header_kinds
+
+
+def _build_header_lookup(headers: list[str]) -> dict[str, str]:
+    """Map export headers to their Excel column letters, in sheet order."""
+    return {
+        header: get_column_letter(column)
+        for column, header in enumerate(headers, start=1)
+    }
+
+
+def _excel_rows(df: pd.DataFrame) -> Iterator[tuple[object, ...]]:
+    """Yield DataFrame rows as plain tuples, with missing values as empty cells."""
+    # Write-only sheets serialize values as-is, so NaN has to become None here the same
+    # way pandas' own Excel writer would have blanked it.
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _row_style_templates(
+    ws: WriteOnlyWorksheet,
+    fill: PatternFill,
+    column_styles: list[dict[str, object]],
+) -> list[StyleArray]:
+    """Build the per-column style ids of a bordered data row painted with ``fill``."""
+    return [
+        style_template(ws, border=THIN_BORDER, fill=fill, **styles)
+        for styles in column_styles
+    ]
+
+
+def write_acta_sheet(
+    ws: WriteOnlyWorksheet,
+    export_df: pd.DataFrame,
+    mp_groups: dict[str, list[str]],
+    mp_codes_with_em: frozenset[str],
+    header_lookup: dict[str, str],
 ) -> None:
-    """Apply the workbook styling directly to an in-memory worksheet."""
-    last_row = ws.max_row
-    ws.freeze_panes = 'C2'
-
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    bold_font = Font(bold=True)
-    center_aligned = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    left_aligned = Alignment(horizontal='left', vertical='center')
+    """
+    Stream the detailed grades into a write-only sheet with the layout staff expects.
 
-    gray_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-    type_a_fill = PatternFill(start_color="F1C232", end_color="F1C232", fill_type="solid")
-    type_b_fill = PatternFill(start_color="B4A7D6", end_color="B4A7D6", fill_type="solid")
-    alt_fill_even = PatternFill(start_color="D9EAD3", end_color="D9EAD3", fill_type="solid")
-    alt_fill_odd = PatternFill(start_color="B6D7A8", end_color="B6D7A8", fill_type="solid")
+    Write-only sheets cannot be revisited, so every style is attached while each row is
+    emitted and the sheet-level settings are fixed before the first row is appended.
+    header_lookup maps the export headers to their column letters.
+    """
+    ws.freeze_panes = 'C2'
 
     student_name_width = 40
     mp_column_width = 15
     ra_column_width = 12
     standard_row_height = 25
-    mp_codes_with_em_set = set(mp_codes_with_em)
-
-    header_styles: dict[int, tuple[PatternFill, Alignment, Optional[str]]] = {}
-    for cell in ws[1]:
-        col_letter = get_column_letter(cell.column)
-        value = str(cell.value).strip() if cell.value else ""
-        formatted_value = None
-
-        if col_letter in {'A', 'B'}:
-            fill = gray_fill
-            alignment = center_aligned if col_letter == 'A' else left_aligned
-        elif value in mp_codes:
-            fill = type_a_fill if value in mp_codes_with_em_set else type_b_fill
-            alignment = center_aligned
-        elif any(value == f"{mp} CENTRE" or value == f"{mp} EMPRESA" for mp in mp_codes_with_em):
-            fill = type_a_fill
-            alignment = center_aligned
-        else:
-            mp_code = _get_mp_for_ra(value, mp_codes)
-            if mp_code:
-                # RA columns inherit their parent MP color so printed workbooks still
-                # show which detailed assessments belong to the same module.
-                fill = type_a_fill if mp_code in mp_codes_with_em_set else type_b_fill
-                alignment = center_aligned
-                formatted_value = _format_ra_header(value)
-            else:
-                fill = PatternFill(fill_type=None)
-                alignment = center_aligned
 
-        header_styles[cell.column] = (fill, alignment, formatted_value)
-
-    ws['A1'].value = "#"
-    ws['B1'].value = "ESTUDIANT"
-    ws.row_dimensions[1].height = 40
-    for row_idx in range(2, last_row + 1):
-        ws.row_dimensions[row_idx].height = standard_row_height
-
-    for row in ws.iter_rows(min_row=1, max_row=last_row):
-        row_idx = row[0].row
-        row_fill = alt_fill_even if (row_idx % 2 == 0) else alt_fill_odd
-        for cell in row:
-            cell.border = border
-            if row_idx == 1:
-                fill, alignment, formatted_value = header_styles[cell.column]
-                cell.font = bold_font
-                cell.fill = fill
-                cell.alignment = alignment
-                if formatted_value is not None:
-                    cell.value = formatted_value
-            else:
-                cell.fill = row_fill
-                if cell.column == 1:
-                    cell.font = bold_font
-                    cell.alignment = center_aligned
-                elif cell.column == 2:
-                    cell.font = bold_font
-                    cell.alignment = left_aligned
-                else:
-                    cell.alignment = center_aligned
+    # The export columns are built from the MP/RA grouping, so every header is
+    # classified with a lookup against that grouping instead of string parsing.
+    header_kinds = _build_header_kinds(mp_groups, mp_codes_with_em)
+
+    # Header styles and column widths come from the same classification, so both are
+    # settled in one pass over the headers before the header row is appended.
+    header_cells: list[Cell] = []
+    width_run: Optional[ColumnDimension] = None
+    for column, (value, col_letter) in enumerate(header_lookup.items(), start=1):
+        kind, mp_code = header_kinds.get(value, ('other', None))
+        width = mp_column_width if kind in {'mp', 'mp_split'} else ra_column_width
+
+        if column in {1, 2}:
+            fill = _GRAY_FILL
+            alignment = CENTER_WRAPPED if column == 1 else LEFT_ALIGNED
+            value = "#" if column == 1 else "ESTUDIANT"
+            width = 6 if column == 1 else student_name_width
+        elif kind == 'mp':
+            fill = _TYPE_A_FILL if mp_code in mp_codes_with_em else _TYPE_B_FILL
+            alignment = CENTER_WRAPPED
+        elif kind == 'mp_split':
+            fill = _TYPE_A_FILL
+            alignment = CENTER_WRAPPED
+        elif kind == 'ra':
+            # RA columns inherit their parent MP color so printed workbooks still
+            # show which detailed assessments belong to the same module.
+            fill = _TYPE_A_FILL if mp_code in mp_codes_with_em else _TYPE_B_FILL
+            alignment = CENTER_WRAPPED
+            value = _format_ra_header(value)
+        else:
+            fill = NO_FILL
+            alignment = CENTER_WRAPPED
 
-    ws.column_dimensions['A'].width = 6
-    ws.column_dimensions['B'].width = student_name_width
-    for cell in ws[1][2:]:
-        col_letter = get_column_letter(cell.column)
-        value = str(cell.value).replace('\n', '').strip() if cell.value else ""
-        if value in mp_codes or any(value == f"{mp} CENTRE" or value == f"{mp} EMPRESA" for mp in mp_codes_with_em):
-            ws.column_dimensions[col_letter].width = mp_column_width
+        # Neighbouring columns of equal width share one dimension spanning the run, so
+        # the sheet stores a single <col> range instead of one entry per column.
+        if width_run is not None and width_run.width == width:
+            width_run.max = column
         else:
-            ws.column_dimensions[col_letter].width = ra_column_width
+            width_run = ws.column_dimensions[col_letter]
+            width_run.width = width
+            width_run.min = width_run.max = column
+
+        cell = WriteOnlyCell(ws, value=value)
+        cell.border = THIN_BORDER
+        cell.font = BOLD_FONT
+        cell.fill = fill
+        cell.alignment = alignment
+        header_cells.append(cell)
+
+    # A sheet-wide default height covers the data and legend rows without creating
+    # one row dimension per student; only the taller header row is set explicitly.
+    ws.sheet_format.defaultRowHeight = standard_row_height
+    ws.sheet_format.customHeight = True
+    ws.row_dimensions[1].height = 40
+    ws.append(header_cells)
+
+    # Data cells only differ by column and row parity, so each combination is resolved
+    # against the workbook style table once and the cells just copy the resulting ids.
+    column_styles = [
+        {'font': BOLD_FONT, 'alignment': CENTER_WRAPPED},
+        {'font': BOLD_FONT, 'alignment': LEFT_ALIGNED},
+    ] + [{'alignment': CENTER_WRAPPED}] * (len(header_lookup) - 2)
+    even_row_styles = _row_style_templates(ws, _ACTA_EVEN_FILL, column_styles)
+    odd_row_styles = _row_style_templates(ws, _ACTA_ODD_FILL, column_styles)
+
+    for row_idx, values in enumerate(_excel_rows(export_df), start=2):
+        row_styles = even_row_styles if (row_idx % 2 == 0) else odd_row_styles
+        row_cells: list[Cell] = []
+        for value, style in zip(values, row_styles):
+            cell = WriteOnlyCell(ws, value=value)
+            apply_style_template(cell, style)
+            row_cells.append(cell)
+        ws.append(row_cells)
 
-    legend_start_row = last_row + 2
     # The legend stays inside the sheet because exported files are often shared or
     # printed on their own, without extra documentation.
-    for offset, (fill, text) in enumerate([
-        (type_a_fill, "MP amb estada a l'empresa"),
-        (type_b_fill, "MP sense estada a l'empresa")
-    ]):
-        row = legend_start_row + offset
-        ws.row_dimensions[row].height = standard_row_height
-        cell1 = ws.cell(row=row, column=1)
-        cell2 = ws.cell(row=row, column=2, value=text)
+    ws.append([])
+    for fill, text in [
+        (_TYPE_A_FILL, "MP amb estada a l'empresa"),
+        (_TYPE_B_FILL, "MP sense estada a l'empresa")
+    ]:
+        cell1 = WriteOnlyCell(ws)
+        cell2 = WriteOnlyCell(ws, value=text)
         cell1.fill = fill
-        cell2.fill = PatternFill(fill_type=None)
-        for cell in (cell1, cell2):
-            cell.border = border
-            cell.font = bold_font
-            cell.alignment = center_aligned if cell.column == 1 else Alignment(wrap_text=True, vertical='center')
+        cell2.fill = NO_FILL
+        for cell, alignment in (
+            (cell1, CENTER_WRAPPED),
+            (cell2, _LEGEND_LABEL_ALIGNED),
+        ):
+            cell.border = THIN_BORDER
+            cell.font = BOLD_FONT
+            cell.alignment = alignment
+        ws.append([cell1, cell2])
 
 
-def _apply_conditional_formatting_to_sheet(
-    ws: Worksheet,
+def apply_conditional_formatting(
+    ws: WriteOnlyWorksheet,
     mp_groups: dict[str, list[str]],
-    mp_codes_with_em: list[str],
+    mp_codes_with_em: frozenset[str],
     mp_codes: list[str],
+    header_lookup: dict[str, str],
+    last_student_row: int,
 ) -> None:
-    """Apply conditional formatting rules directly to an in-memory worksheet."""
-    last_student_row = ws.max_row - 3
+    """
+    Highlight values that need review, such as missing grades or failing marks.
+
+    header_lookup maps the export headers to column letters and last_student_row is
+    the final data row. Both come from the export DataFrame because a write-only sheet
+    cannot be read back.
+    """
     if last_student_row < 2:
         return
 
-    red_fill = PatternFill(start_color="FFD9D9", end_color="FFD9D9", fill_type="solid")
-    orange_fill = PatternFill(start_color="FFE6CC", end_color="FFE6CC", fill_type="solid")
-    red_font = Font(color="FF0000")
-    header_lookup = _build_header_lookup(ws)
-
-    def get_column_for_header(header: str) -> Optional[str]:
-        return header_lookup.get(str(header).replace('\n', '').strip())
-
-    def apply_rules_to_column(col_letter: str) -> None:
-        range_ref = f'{col_letter}2:{col_letter}{last_student_row}'
-        first_cell_ref = f'{col_letter}2'
-
-        # Rules are written against the first row of the range because Excel shifts the
-        # relative reference automatically for each cell in the formatted range.
-        orange_formula = (
-            f'OR(ISNUMBER(SEARCH("PDT",{first_cell_ref})),'
-            f'ISNUMBER(SEARCH("EP",{first_cell_ref})),'
-            f'ISNUMBER(SEARCH("PQ",{first_cell_ref})))'
-        )
-        red_fill_formula = (
-            f'AND(NOT(ISNUMBER({first_cell_ref})),'
-            f'ISERROR(SEARCH("PDT",{first_cell_ref})),'
-            f'ISERROR(SEARCH("EP",{first_cell_ref})),'
-            f'ISERROR(SEARCH("PQ",{first_cell_ref})))'
-        )
-
-        ws.conditional_formatting.add(
-            range_ref,
-            FormulaRule(formula=[orange_formula], fill=orange_fill, stopIfTrue=True),
-        )
-        ws.conditional_formatting.add(
-            range_ref,
-            FormulaRule(formula=[red_fill_formula], fill=red_fill, stopIfTrue=True),
-        )
-        ws.conditional_formatting.add(
-            range_ref,
-            FormulaRule(formula=[f'AND(ISNUMBER({first_cell_ref}), {first_cell_ref}<5)'], font=red_font, stopIfTrue=True),
-        )
-
-    for mp_code in mp_codes:
-        for ra_code in mp_groups.get(mp_code, []):
-            col_letter = get_column_for_header(ra_code)
-            if col_letter:
-                apply_rules_to_column(col_letter)
-
+    # RA columns and then CENTRE/EMPRESA/MP grades of every MP get the same rules.
+    graded_headers: set[str] = set()
     for mp_code in mp_codes:
-        related_headers = [mp_code]
+        graded_headers.update(mp_groups.get(mp_code, []))
         if mp_code in mp_codes_with_em:
-            related_headers.insert(0, f"{mp_code} EMPRESA")
-            related_headers.insert(0, f"{mp_code} CENTRE")
-        for header in related_headers:
-            col_letter = get_column_for_header(header)
-            if col_letter:
-                apply_rules_to_column(col_letter)
-
-
+            graded_headers.update([f"{mp_code} CENTRE", f"{mp_code} EMPRESA"])
+        graded_headers.add(mp_code)
+
+    # Every rule is registered once over a multi-range of all graded columns instead of
+    # once per column. The ranges follow sheet order so the first one is the top-left
+    # anchor Excel shifts the relative references from.
+    graded_ranges = ' '.join(
+        f'{col_letter}2:{col_letter}{last_student_row}'
+        for header, col_letter in header_lookup.items()
+        if header in graded_headers
+    )
+    if not graded_ranges:
+        return
+    first_cell_ref = graded_ranges.split(':', 1)[0]
 
-def _apply_pending_ra_summary_formatting(ws: Worksheet, row_count: int) -> None:
-    """Apply readable formatting to the pending-RA summary sheet."""
-    ws.freeze_panes = 'C2'
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
+    orange_formula = (
+        f'OR(ISNUMBER(SEARCH("PDT",{first_cell_ref})),'
+        f'ISNUMBER(SEARCH("EP",{first_cell_ref})),'
+        f'ISNUMBER(SEARCH("PQ",{first_cell_ref})))'
+    )
+    red_fill_formula = (
+        f'AND(NOT(ISNUMBER({first_cell_ref})),'
+        f'ISERROR(SEARCH("PDT",{first_cell_ref})),'
+        f'ISERROR(SEARCH("EP",{first_cell_ref})),'
+        f'ISERROR(SEARCH("PQ",{first_cell_ref})))'
     )
-    bold_font = Font(bold=True)
-    header_font = Font(bold=True, color='FFFFFF')
-    shared_header_font = Font(bold=True)
-    center_aligned = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    left_aligned = Alignment(horizontal='left', vertical='center', wrap_text=True)
-    header_fill = PatternFill(start_color='1C4587', end_color='1C4587', fill_type='solid')
-    shared_header_fill = PatternFill(start_color='D9D9D9', end_color='D9D9D9', fill_type='solid')
-    alt_fill_even = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-    alt_fill_odd = PatternFill(start_color='EEF6FF', end_color='EEF6FF', fill_type='solid')
 
-    ws.row_dimensions[1].height = 34
-    for row_idx in range(2, row_count + 2):
-        row_values = [ws.cell(row=row_idx, column=column).value for column in range(1, 5)]
-        max_lines = max(_count_display_lines(value) for value in row_values)
-        ws.row_dimensions[row_idx].height = max(24, 16 * max_lines + 8)
+    ws.conditional_formatting.add(
+        graded_ranges,
+        FormulaRule(formula=[orange_formula], fill=_REVIEW_FILL, stopIfTrue=True),
+    )
+    ws.conditional_formatting.add(
+        graded_ranges,
+        FormulaRule(formula=[red_fill_formula], fill=_MISSING_FILL, stopIfTrue=True),
+    )
+    # Blank and text cells are already caught by the rules above, so the failing-grade
+    # check can use Excel's built-in comparison instead of another formula.
+    ws.conditional_formatting.add(
+        graded_ranges,
+        CellIsRule(operator='lessThan', formula=['5'], font=_FAILING_FONT, stopIfTrue=True),
+    )
 
-    for row in ws.iter_rows(min_row=1, max_row=row_count + 1, max_col=4):
-        row_idx = row[0].row
-        row_fill = alt_fill_even if row_idx % 2 == 0 else alt_fill_odd
-        for cell in row:
-            cell.border = border
-            if row_idx == 1:
-                if cell.column in {1, 2}:
-                    cell.font = shared_header_font
-                    cell.fill = shared_header_fill
-                else:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                cell.alignment = center_aligned if cell.column != 2 else left_aligned
-            else:
-                cell.fill = row_fill
-                if cell.column == 1:
-                    cell.font = bold_font
-                    cell.alignment = center_aligned
-                else:
-                    cell.alignment = left_aligned
 
+def _write_pending_ra_summary_sheet(ws: WriteOnlyWorksheet, summary_df: pd.DataFrame) -> None:
+    """Stream the pending-RA summary rows into a write-only sheet with readable formatting."""
+    ws.freeze_panes = 'C2'
     ws.column_dimensions['A'].width = 6
     ws.column_dimensions['B'].width = 34
     ws.column_dimensions['C'].width = 44
     ws.column_dimensions['D'].width = 28
 
+    # Row heights are emitted together with each row, so size them from the values
+    # before anything is appended.
+    rows = list(_excel_rows(summary_df))
+    ws.row_dimensions[1].height = 34
+    for row_idx, row_values in enumerate(rows, start=2):
+        max_lines = max(_count_display_lines(value) for value in row_values)
+        ws.row_dimensions[row_idx].height = max(24, 16 * max_lines + 8)
+
+    header_cells: list[Cell] = []
+    for column, header in enumerate(summary_df.columns, start=1):
+        cell = WriteOnlyCell(ws, value=header)
+        cell.border = THIN_BORDER
+        if column in {1, 2}:
+            cell.font = BOLD_FONT
+            cell.fill = _GRAY_FILL
+        else:
+            cell.font = _WHITE_BOLD_FONT
+            cell.fill = _SUMMARY_HEADER_FILL
+        cell.alignment = CENTER_WRAPPED if column != 2 else LEFT_WRAPPED
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    column_styles = [{'font': BOLD_FONT, 'alignment': CENTER_WRAPPED}] + (
+        [{'alignment': LEFT_WRAPPED}] * (len(summary_df.columns) - 1)
+    )
+    even_row_styles = _row_style_templates(ws, _SUMMARY_EVEN_FILL, column_styles)
+    odd_row_styles = _row_style_templates(ws, _SUMMARY_ODD_FILL, column_styles)
+
+    for row_idx, row_values in enumerate(rows, start=2):
+        row_styles = even_row_styles if row_idx % 2 == 0 else odd_row_styles
+        row_cells: list[Cell] = []
+        for value, style in zip(row_values, row_styles):
+            cell = WriteOnlyCell(ws, value=value)
+            apply_style_template(cell, style)
+            row_cells.append(cell)
+        ws.append(row_cells)
 
 
 def _count_display_lines(value: object) -> int:
@@ -0,0 +1,39 @@
+"""
+Style helpers shared by the generated Acta and summary workbooks.
+"""
+
+from copy import copy
+
+from openpyxl.cell import Cell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.styles.cell_style import StyleArray
+
+# Styles are shared by every cell and rule on every export. openpyxl style objects are
+# immutable, so cells can all point at the same instances instead of rebuilding them.
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+BOLD_FONT = Font(bold=True)
+CENTER_WRAPPED = Alignment(horizontal='center', vertical='center', wrap_text=True)
+LEFT_ALIGNED = Alignment(horizontal='left', vertical='center')
+LEFT_WRAPPED = Alignment(horizontal='left', vertical='center', wrap_text=True)
+NO_FILL = PatternFill(fill_type=None)
+
+
+def style_template(ws, **styles: object) -> StyleArray:
+    """
+    Register a style combination with the workbook once and return its style ids.
+
+    Works for regular and write-only worksheets alike, since both hand the style
+    tables of their parent workbook to the cells created for them.
+    """
+    cell = Cell(ws)
+    for name, value in styles.items():
+        setattr(cell, name, value)
+    return cell._style
+
+
+def apply_style_template(cell: Cell, template: StyleArray) -> None:
+    """Give a cell the style ids registered by style_template."""
+    # Copying the ids skips openpyxl's per-attribute style lookups, which dominate when
+    # thousands of cells share a handful of combinations.
+    cell._style = copy(template)
@@ -7,6 +7,21 @@ import unicodedata
 
 import pandas as pd
 
+# Patterns are compiled once per process and shared by every converted file.
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_NUMERIC_GRADE_PATTERN = re.compile(r"A?\d+")
+_EM_ENTRY_PATTERN = re.compile(
+    r"""
+    (?P<code>[A-Za-z0-9]{3,5}               # MP code format
+    _               
+    [A-Za-z0-9 ]{4,5}                       # CF code format (allow spaces)
+    _                       
+    \d(?:\s*\d)EM)                          # EM
+    \s\(\d\)                                # round (convocatòria)
+    """,
+    flags=re.IGNORECASE | re.VERBOSE
+)
+
 
 def extract_records(
     melted: pd.DataFrame,
@@ -20,34 +35,31 @@ def extract_records(
     - Purely numeric grades (e.g. '8') are converted to the integer 8
     - Other grades (PDT, EP, NA, etc.) are kept as strings
     """
-    rows = []
-    name_col_index = melted.columns.get_loc(name_col)
-    entry_index = melted.columns.get_loc('entry')
-
-    for row in melted.itertuples(index=False, name=None):
-        student_name = row[name_col_index]
-        entry_value = row[entry_index]
-        # One text cell can contain multiple code/grade pairs, so regex extraction
-        # yields zero, one, or many output rows for the same input record.
-        for code, grade in entry_pattern.findall(entry_value):
-            # Normalize whitespace in code
-            code = re.sub(r"\s+", "", code)
-            # Keep numeric grades numeric so Excel formulas and sorting behave naturally.
-            if grade.startswith('A') and grade[1:].isdigit():
-                # 'A7' → 7
-                grade_val = int(grade[1:])
-            elif grade.isdigit():
-                # '8' → 8
-                grade_val = int(grade)
-            else:
-                # 'PDT', 'EP', 'NA', etc.
-                grade_val = grade        
-            rows.append({
-                'estudiant': student_name,
-                'code': code,
-                'grade': grade_val
-            })
-    df = pd.DataFrame(rows)
+    # One text cell can contain multiple code/grade pairs, so regex extraction
+    # yields zero, one, or many output rows for the same input record. Entries are
+    # renumbered positionally so each match maps straight back to its student.
+    entries = melted['entry'].reset_index(drop=True)
+    matches = entries.str.extractall(entry_pattern)
+    if matches.empty:
+        return pd.DataFrame()
+
+    source_rows = matches.index.get_level_values(0)
+    # Normalize whitespace in code
+    codes = matches.iloc[:, 0].str.replace(_WHITESPACE_PATTERN, "", regex=True)
+    # Optional grade groups that did not participate read as '' like findall did.
+    grades = matches.iloc[:, 1].fillna('')
+
+    # Keep numeric grades numeric so Excel formulas and sorting behave naturally:
+    # 'A7' → 7 and '8' → 8, while 'PDT', 'EP', 'NA', etc. stay as text.
+    is_numeric = grades.str.fullmatch(_NUMERIC_GRADE_PATTERN)
+    grade_values = grades.astype(object)
+    grade_values[is_numeric] = [int(grade.lstrip('A')) for grade in grades[is_numeric]]
+
+    df = pd.DataFrame({
+        'estudiant': melted[name_col].to_numpy()[source_rows],
+        'code': codes.to_numpy(),
+        'grade': grade_values.to_numpy(),
+    }).infer_objects()
     return df
 
 
@@ -58,52 +70,28 @@ def extract_mp_codes(records: pd.DataFrame) -> list[str]:
     RA records are the most reliable place to discover the MP structure because every
     detailed assessment line includes its parent MP prefix.
     """
-    mp_pattern = re.compile(r'^([A-Za-z0-9]+)_')
-    mp_codes = records['code'].str.extract(mp_pattern, expand=False)
+    # The MP code is everything before the first underscore, a fixed separator that
+    # needs no regex.
+    mp_codes = records['code'].str.split('_', n=1).str[0]
     return sorted(mp_codes.unique().tolist())
 
 
 def find_mp_codes_with_em(melted: pd.DataFrame, mp_codes: list[str]) -> list[str]:
     """
-    Find which MP codes have associated EM entries
-    (stops searching once all MP codes have been checked).
+    Find which MP codes have associated EM entries.
     """
-    em_entry_pattern = re.compile(
-        r"""
-        (?P<code>[A-Za-z0-9]{3,5}               # MP code format
-        _               
-        [A-Za-z0-9 ]{4,5}                       # CF code format (allow spaces)
-        _                       
-        \d(?:\s*\d)EM)                          # EM
-        \s\(\d\)                                # round (convocatòria)
-        """,
-        flags=re.IGNORECASE | re.VERBOSE
+    # Only entries mentioning "EM" can match, so a plain substring filter trims the
+    # column before the regex runs. The remaining entries are scanned column-wise.
+    entries = melted['entry'].astype(str)
+    em_entries = entries[entries.str.contains('EM', regex=False)]
+    em_codes = em_entries.str.findall(_EM_ENTRY_PATTERN).explode().dropna()
+    em_mp_codes = (
+        em_codes.str.replace(_WHITESPACE_PATTERN, "", regex=True)
+        .str.split('_', n=1).str[0]
     )
-    
-    mp_with_em = set()
-    mp_code_set = set(mp_codes)
-    mp_pattern = re.compile(r'^([A-Za-z0-9]+)_')
-    
-    # Stop early once every known MP has been matched. This keeps large ZIP batches fast.
-    for entry in melted['entry']:
-        # Check if entry contains any EM pattern
-        if 'EM' not in str(entry):
-            continue
-            
-        # Extract MP codes from EM entries
-        for code in em_entry_pattern.findall(str(entry)):
-            code_no_space = re.sub(r"\s+", "", code)
-            mp_match = mp_pattern.match(code_no_space)
-            if mp_match:
-                mp_code = mp_match.group(1)
-                if mp_code in mp_code_set:
-                    mp_with_em.add(mp_code)
-                    
-        # If we've found EM entries for all MP codes, we can stop
-        if len(mp_with_em) == len(mp_codes):
-            break
-            
-    return sorted(list(mp_with_em))
+
+    mp_with_em = set(em_mp_codes) & set(mp_codes)
+    return sorted(mp_with_em)
 
 
 def sort_records(df: pd.DataFrame) -> pd.DataFrame:
@@ -130,8 +118,16 @@ def sort_records(df: pd.DataFrame) -> pd.DataFrame:
     # Normalizing embedded line breaks here keeps later pivoting deterministic even if
     # the PDF extractor preserved the original wrapped text layout.
     df['estudiant'] = df['estudiant'].str.replace(r"\s*\n\s*", ' ', regex=True).str.strip()
-    df = df.sort_values(
-        by=['estudiant', 'code'],
-        key=lambda c: _student_sort_key(c) if c.name == 'estudiant' else c.str.casefold()
-    ).reset_index(drop=True)
+
+    # Every student appears once per record, so the accent-folding key is built once
+    # per distinct name and mapped back. Both keys are plain columns for the sort.
+    names = df['estudiant'].fillna("")
+    distinct_names = names.unique()
+    name_keys = dict(zip(distinct_names, _student_sort_key(pd.Series(distinct_names))))
+    df = (
+        df.assign(_name_key=names.map(name_keys), _code_key=df['code'].str.casefold())
+        .sort_values(by=['_name_key', '_code_key'])
+        .drop(columns=['_name_key', '_code_key'])
+        .reset_index(drop=True)
+    )
     return df
@@ -7,6 +7,13 @@ from __future__ import annotations
 import pdfplumber
 import pandas as pd
 
+# Esfer@ reports draw visible table lines, so pdfplumber can follow them directly.
+_DEFAULT_TABLE_OPTS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 3
+}
+
 
 def extract_tables(pdf_path: str, table_opts: dict = None) -> list[pd.DataFrame]:
     """
@@ -15,13 +22,6 @@ def extract_tables(pdf_path: str, table_opts: dict = None) -> list[pd.DataFrame]
     The default pdfplumber settings are tuned for Esfer@ reports, which use visible
     table lines and benefit from a small snap tolerance.
     """
-    if table_opts is None:
-        table_opts = {
-            "vertical_strategy": "lines",
-            "horizontal_strategy": "lines",
-            "snap_tolerance": 3
-        }
-
     _group_code, tables = extract_group_code_and_tables(pdf_path, table_opts)
     return tables
 
@@ -46,11 +46,7 @@ def extract_group_code_and_tables(
     opening the PDF only once avoids duplicate parsing work.
     """
     if table_opts is None:
-        table_opts = {
-            "vertical_strategy": "lines",
-            "horizontal_strategy": "lines",
-            "snap_tolerance": 3
-        }
+        table_opts = _DEFAULT_TABLE_OPTS
 
     tables: list[pd.DataFrame] = []
     group_code = 'unknown_group'
@@ -7,25 +7,88 @@ report is designed for quicker review and manual editing by teaching staff.
 
 import pandas as pd
 from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.styles import PatternFill, Font, Alignment
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.formatting.rule import FormulaRule
 import re
 import os
 import time
+from functools import lru_cache
+
+from .excel_styles import (
+    BOLD_FONT,
+    CENTER_WRAPPED,
+    LEFT_ALIGNED,
+    LEFT_WRAPPED,
+    NO_FILL,
+    THIN_BORDER,
+    apply_style_template,
+    style_template,
+)
+
+# Styles only the summary uses; the common ones live in excel_styles.
+_RED_FONT = Font(color="FF0000")
+_CENTER_ALIGNED = Alignment(horizontal="center", vertical="center")
+
+# MP, "<MP>_..._RA", "<MP> CENTRE" and "<MP> EMPRESA" headers all name their MP code.
+_MP_COLUMN_PATTERN = re.compile(r"^(?P<code>[A-Za-z0-9]{3,5})(?:_.*RA| CENTRE| EMPRESA)?$")
+
+# Range and message of each summary data-validation rule.
+_DATA_VALIDATION_RULES = {
+    'centre': {
+        'type': "decimal",
+        'formula2': 9,
+        'error': 'Introdueix un número entre 0 i 9 amb un màxim de dos decimals.',
+    },
+    'type_a': {
+        'type': "decimal",
+        'formula2': 10,
+        'error': 'Introdueix un número entre 0 i 10 amb un màxim de dos decimals.',
+    },
+    'type_b': {
+        'type': "whole",
+        'formula2': 10,
+        'error': 'Introdueix un número enter entre 0 i 10.',
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def _solid_fill(color: str) -> PatternFill:
+    """Return the shared solid fill for a hex color."""
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
 
 def _extract_mp_codes_from_columns(columns: list[str]) -> list[str]:
     """Extract the MP codes implied by workbook column names."""
-    mp_codes = set()
-    mp_pattern = re.compile(r"^(?P<code>[A-Za-z0-9]{3,5})(?:_.*RA| CENTRE| EMPRESA)?$")
-    for col in columns:
-        match = mp_pattern.match(col)
-        if match:
-            code = match.group('code')
-            if code and code.lower() != 'estudiant':
-                mp_codes.add(code)
-    return sorted(list(mp_codes))
+    # One regex sweep over all headers; non-matching columns come back as NaN.
+    codes = pd.Series(columns, dtype=object).str.extract(_MP_COLUMN_PATTERN, expand=False).dropna()
+    codes = codes[codes.str.lower() != 'estudiant']
+    return sorted(codes.unique().tolist())
+
+
+def _read_source_sheet(source_xlsx_path: str) -> pd.DataFrame:
+    """
+    Read the first worksheet's cell values into a DataFrame.
+
+    Read-only mode streams the sheet XML without building styled cells, which is all
+    the summary needs since it only selects a few value columns.
+    """
+    wb = load_workbook(source_xlsx_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        # Blank headers get pandas' placeholder names so column lookups stay string-based.
+        header = [
+            f"Unnamed: {index}" if value is None else value
+            for index, value in enumerate(next(ws.iter_rows(max_row=1, values_only=True), ()))
+        ]
+        rows = ws.iter_rows(min_row=2, max_col=len(header), values_only=True)
+        return pd.DataFrame(list(rows), columns=header)
+    finally:
+        wb.close()
+
 
 MAX_READ_ATTEMPTS = 3
 READ_RETRY_DELAY_SECONDS = 5
@@ -42,7 +105,7 @@ def generate_summary_report(source_xlsx_path: str, output_summary_path: str):
 
     for attempt in range(1, MAX_READ_ATTEMPTS + 1):
         try:
-            df_source = pd.read_excel(source_xlsx_path, sheet_name=0)
+            df_source = _read_source_sheet(source_xlsx_path)
             break
         except FileNotFoundError:
             print(f"[ERROR summary_generator] Source file not found: {source_xlsx_path}.")
@@ -103,328 +166,255 @@ def generate_summary_report(source_xlsx_path: str, output_summary_path: str):
         summary_df.rename(columns={student_col_actual_name: 'estudiant'}, inplace=True)
 
     summary_df.insert(0, '#', range(1, len(summary_df) + 1))
-    with pd.ExcelWriter(output_summary_path, engine='openpyxl') as writer:
-        summary_df.to_excel(writer, index=False, sheet_name='Summary')
 
-    # The file is written once here to establish the basic sheet, then opened again for
-    # formatting because openpyxl styling is easier to express on an existing workbook.
-
-    # Find the actual student column name (case-insensitive)
-    student_col_actual_name = None
-    for col in df_source.columns:
-        if col.lower() == 'estudiant':
-            student_col_actual_name = col
-            break
-    
-    if not student_col_actual_name:
-        print(f"[ERROR summary_generator] Could not find a student column (e.g., 'estudiant') in {source_xlsx_path}.")
-        return
-
-    summary_df_cols_to_select = [student_col_actual_name] + [info['col_name'] for info in mp_info_for_summary]
-    
-    # Ensure all selected columns exist in df_source (should be guaranteed by checks above)
-    summary_df = df_source[summary_df_cols_to_select].copy()
-    # Rename student column to 'estudiant' for consistency in the summary file if it was different
-    if student_col_actual_name != 'estudiant':
-        summary_df.rename(columns={student_col_actual_name: 'estudiant'}, inplace=True)
-    
-    # Add numbered column as the first column
-    summary_df.insert(0, '#', range(1, len(summary_df) + 1))
-
-    # Build the same summary dataframe again for the formatting step. This is older CLI
-    # code rather than the main web path, so the goal here is readability and stability
-    # rather than squeezing out more performance.
     try:
         with pd.ExcelWriter(output_summary_path, engine='openpyxl') as writer:
             summary_df.to_excel(writer, index=False, sheet_name='Summary')
+            # Format the sheet pandas just built so the workbook is serialized only once.
+            _format_summary_sheet(writer.sheets['Summary'], summary_df, mp_info_for_summary)
+    except Exception as e:
+        # Clean up partially created file if error occurs during writing/formatting
+        if os.path.exists(output_summary_path):
+            try:
+                os.remove(output_summary_path)
+            except Exception as remove_e:
+                print(f"[ERROR summary_generator] Could not remove partial file {output_summary_path}: {remove_e}")
+        print(f"[ERROR summary_generator] Error writing or formatting summary file {output_summary_path}: {e}")
 
-        wb = load_workbook(output_summary_path)
-        ws = wb['Summary']
 
-        ws.freeze_panes = 'C2'  # Freeze first two rows and first column
+def _format_summary_sheet(ws: Worksheet, summary_df: pd.DataFrame, mp_info_for_summary: list[dict]) -> None:
+    """Apply the summary layout, validations, and highlighting to the written sheet."""
+    ws.freeze_panes = 'C2'  # Freeze first two rows and first column
 
-        thin_border_side = Side(border_style="thin", color="000000")
-        thin_border = Border(left=thin_border_side, right=thin_border_side, top=thin_border_side, bottom=thin_border_side)
+    # Define standard row height
+    STANDARD_ROW_HEIGHT = 25 # Define the standard row height here
 
-        # Define standard row height
-        STANDARD_ROW_HEIGHT = 25 # Define the standard row height here
+    # pandas wrote one header row plus one row per student, so the last row is known
+    # without asking openpyxl to recompute the sheet dimensions.
+    last_row = len(summary_df) + 1
 
-        # Set row heights for all rows
-        ws.row_dimensions[1].height = 40  # Header row height
-        for row_idx in range(2, ws.max_row + 1):
-            ws.row_dimensions[row_idx].height = STANDARD_ROW_HEIGHT
+    # Index the MP metadata by column name once instead of scanning the list per column.
+    mp_info_by_column = {info['col_name']: info for info in mp_info_for_summary}
+    # Column letters are needed by every pass below, so resolve them once up front.
+    column_letters = {
+        col_idx: get_column_letter(col_idx) for col_idx in range(1, len(summary_df.columns) + 1)
+    }
 
-        # Format header row
-        for col_idx, column_title_from_df in enumerate(summary_df.columns, 1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.font = Font(bold=True)
-            cell.border = thin_border
-            
-            if column_title_from_df == '#':
-                cell.value = '#'
-                cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            elif column_title_from_df.lower() == 'estudiant':
-                cell.value = "ESTUDIANT" # Capitalize header for display
-                cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-                cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True) # Left-align header
-            else:
-                # For MP columns
-                cell.value = column_title_from_df # Use the original MP column name for the header
-                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                current_mp_info = next((info for info in mp_info_for_summary if info['col_name'] == column_title_from_df), None)
-                if current_mp_info:
-                    cell.fill = PatternFill(start_color=current_mp_info['header_bg'], end_color=current_mp_info['header_bg'], fill_type="solid")
-
-        # Data validation rules reflect the grading rules used by the school:
-        # company-placement modules accept decimals, while other modules expect integers.
-        # First, collect all data validations to apply to columns
-        data_validations = {}
-        for col_idx, col_name in enumerate(summary_df.columns, 1):
-            if col_name.lower() == 'estudiant':
-                continue  # Skip student column
-                
-            current_mp_info = next((info for info in mp_info_for_summary if info['col_name'] == col_name), None)
-            if current_mp_info and current_mp_info['type_a']:
-                # If this is a CENTRE column, restrict to 0-9
-                if current_mp_info['col_name'].endswith('CENTRE'):
-                    dv = DataValidation(
-                        type="decimal",
-                        operator="between",
-                        formula1=0,
-                        formula2=9,
-                        allow_blank=True,
-                        errorTitle='Valor invàlid',
-                        error='Introdueix un número entre 0 i 9 amb un màxim de dos decimals.',
-                        showErrorMessage=True
-                    )
-                else:
-                    # For other Type A columns (e.g., MP final grade), allow 0-10
-                    dv = DataValidation(
-                        type="decimal",
-                        operator="between",
-                        formula1=0,
-                        formula2=10,
-                        allow_blank=True,
-                        errorTitle='Valor invàlid',
-                        error='Introdueix un número entre 0 i 10 amb un màxim de dos decimals.',
-                        showErrorMessage=True
-                    )
-                # Store the validation with column index as key
-                data_validations[col_idx] = dv
-                ws.add_data_validation(dv)
-            elif current_mp_info and not current_mp_info['type_a']:  # Type B columns
-                # For Type B columns, allow only integers 0-10
-                dv = DataValidation(
-                    type="whole",
-                    operator="between",
-                    formula1=0,
-                    formula2=10,
-                    allow_blank=True,
-                    errorTitle='Valor invàlid',
-                    error='Introdueix un número enter entre 0 i 10.',
-                    showErrorMessage=True
-                )
-                data_validations[col_idx] = dv
-                ws.add_data_validation(dv)
-        
-        # Define alternating row colors for data rows
-        light_green = PatternFill(start_color="D9EAD3", end_color="D9EAD3", fill_type="solid")
-        dark_green = PatternFill(start_color="B6D7A8", end_color="B6D7A8", fill_type="solid")
+    # Set row heights for all rows: a sheet-wide default instead of one row dimension
+    # per student, with only the header (and later the legend) rows overridden.
+    ws.sheet_format.defaultRowHeight = STANDARD_ROW_HEIGHT
+    ws.sheet_format.customHeight = True
+    ws.row_dimensions[1].height = 40  # Header row height
 
-        # First, apply all existing formatting
-        for row_idx, row in enumerate(ws.iter_rows(min_row=1), 1):
-            is_data_row = 1 < row_idx <= len(summary_df) + 1  # Only actual data rows
-            
-            # Determine row fill for data rows
-            if is_data_row:
-                row_fill = light_green if (row_idx % 2 == 0) else dark_green
-            
-            for col_idx, cell in enumerate(row, 1):
-                col_name = summary_df.columns[col_idx - 1] if col_idx <= len(summary_df.columns) else ""
-                
-                # Apply borders to all cells
-                cell.border = thin_border
-                
-                # Apply cell-specific formatting
-                if col_name == '#':  # Number column
-                    if row_idx == 1:  # Header row
-                        cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-                        cell.font = Font(bold=True)
-                        cell.alignment = Alignment(horizontal="center", vertical="center")
-                    else:  # Number cells
-                        cell.fill = row_fill if is_data_row else PatternFill(start_color="D9F7F0", end_color="D9F7F0", fill_type="solid")
-                        cell.font = Font(bold=True)
-                        cell.alignment = Alignment(horizontal="center", vertical="center")
-                elif col_name.lower() == 'estudiant':  # Student column
-                    if row_idx == 1:  # Header row
-                        cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-                        cell.font = Font(bold=True)
-                    else:  # Student names
-                        cell.fill = row_fill if is_data_row else PatternFill(start_color="D9F7F0", end_color="D9F7F0", fill_type="solid")
-                        cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                elif is_data_row and col_name:  # Data cells in data rows
-                    cell.fill = row_fill
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                else:  # MP columns and other cells
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                
-                # Apply data validation if it exists for this column
-                if col_idx in data_validations:
-                    col_letter = get_column_letter(col_idx)
-                    data_validations[col_idx].add(f"{col_letter}{row_idx}")
-        
-        # For Type B MP data cells, no specific data validation beyond default cell properties (center alignment)
-        
-        # Apply number formatting based on MP type
-        for col_idx, col_name in enumerate(summary_df.columns, 1):
-            # Skip non-MP columns
-            if col_name in ['#', 'estudiant']:
-                continue
-                
-            # Find the MP info for this column
-            mp_info = next((mp for mp in mp_info_for_summary if mp['col_name'] == col_name), None)
-            if not mp_info:
-                continue
-                
-            # Format the column based on MP type
-            for row in ws.iter_rows(min_row=2, max_row=len(summary_df) + 1, min_col=col_idx, max_col=col_idx):
-                for cell in row:
-                    if mp_info['type_a']:
-                        cell.number_format = '0.00'  # 2 decimal places for Type A
-                    else:
-                        cell.number_format = '0'  # Integer for Type B
-        
-        # Conditional formatting turns the summary into a working checklist by calling
-        # attention to missing values, special markers, and grades below the threshold.
-        # Add conditional formatting to highlight empty or non-numeric cells in red
-        red_fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
+    # Format header row
+    for col_idx, column_title_from_df in enumerate(summary_df.columns, 1):
+        cell = ws.cell(row=1, column=col_idx)
+        cell.font = BOLD_FONT
+        cell.border = THIN_BORDER
         
-        # New fill for specific strings
-        orange_fill = PatternFill(start_color="FFE6CC", end_color="FFE6CC", fill_type="solid")
-
-        # Define red font for numbers < 5
-        red_font = Font(color="FF0000")
-
-        for col_idx, col_name in enumerate(summary_df.columns, 1):
-            # IMPORTANT: Skip the first two columns ('#' and 'estudiant') for conditional formatting
-            if col_name.lower() == 'estudiant' or col_name == '#':
-                continue
-                
-            # Determine the threshold for red text based on column name
-            threshold = 4.5 if col_name.endswith('CENTRE') else 5
-
-            # Create a formula that checks if the cell is empty or not a number
-            col_letter = get_column_letter(col_idx)
-            range_str = f"{col_letter}2:{col_letter}{ws.max_row}"
+        if column_title_from_df == '#':
+            cell.value = '#'
+            cell.fill = _solid_fill("D9D9D9")
+            cell.alignment = _CENTER_ALIGNED
+        elif column_title_from_df.lower() == 'estudiant':
+            cell.value = "ESTUDIANT" # Capitalize header for display
+            cell.fill = _solid_fill("D9D9D9")
+            cell.alignment = LEFT_ALIGNED # Left-align header
+        else:
+            # For MP columns
+            cell.value = column_title_from_df # Use the original MP column name for the header
+            cell.alignment = _CENTER_ALIGNED
+            current_mp_info = mp_info_by_column.get(column_title_from_df)
+            if current_mp_info:
+                cell.fill = _solid_fill(current_mp_info['header_bg'])
+
+    # Data validation rules reflect the grading rules used by the school:
+    # company-placement modules accept decimals, while other modules expect integers.
+    # Columns sharing a rule share one validation, which gets each whole column as a
+    # single range instead of one cell reference per row.
+    data_validations: dict[str, DataValidation] = {}
+    for col_idx, col_name in enumerate(summary_df.columns, 1):
+        if col_name.lower() == 'estudiant':
+            continue  # Skip student column
             
-            # Add conditional formatting rule for cells containing specific strings (PDT, EP, PQ)
-            # This rule should be applied *before* the general non-numeric/empty rule
-            # because conditional formatting rules are applied in the order they are added.
-            # The stopIfTrue=True ensures that if this rule applies, the next rule is not checked.
-            ws.conditional_formatting.add(
-                range_str,
-                FormulaRule(
-                    formula=[
-                        f'OR(UPPER({col_letter}2)="PDT", '
-                        f'UPPER({col_letter}2)="EP", '
-                        f'UPPER({col_letter}2)="PQ")'
-                    ],
-                    stopIfTrue=True,
-                    fill=orange_fill
-                )
+        current_mp_info = mp_info_by_column.get(col_name)
+        if not current_mp_info:
+            continue
+        if current_mp_info['type_a']:
+            # CENTRE columns are restricted to 0-9, other Type A columns
+            # (e.g., MP final grade) allow 0-10
+            rule = 'centre' if current_mp_info['col_name'].endswith('CENTRE') else 'type_a'
+        else:
+            # For Type B columns, allow only integers 0-10
+            rule = 'type_b'
+
+        dv = data_validations.get(rule)
+        if dv is None:
+            dv = DataValidation(
+                operator="between",
+                formula1=0,
+                allow_blank=True,
+                errorTitle='Valor invàlid',
+                showErrorMessage=True,
+                **_DATA_VALIDATION_RULES[rule]
             )
-
-            # Add conditional formatting rule for empty cells or non-numeric values
-            ws.conditional_formatting.add(
-                range_str,
-                FormulaRule(
-                    formula=[f'OR(ISBLANK({col_letter}2), NOT(ISNUMBER({col_letter}2)))'],
-                    stopIfTrue=True,
-                    fill=red_fill
-                )
+            data_validations[rule] = dv
+            ws.add_data_validation(dv)
+        # Validations have always covered the header cell of their column as well.
+        col_letter = column_letters[col_idx]
+        dv.add(f"{col_letter}1:{col_letter}{last_row}")
+    
+    # Define alternating row colors for data rows
+    light_green = _solid_fill("D9EAD3")
+    dark_green = _solid_fill("B6D7A8")
+
+    # Classify each column once so the per-cell loop below only looks up its kind.
+    column_kinds = {
+        col_idx: '#' if col_name == '#' else 'estudiant' if col_name.lower() == 'estudiant' else 'grade'
+        for col_idx, col_name in enumerate(summary_df.columns, 1)
+    }
+
+    # Data cells differ only by column kind and row parity, so every combination is
+    # registered with the workbook style tables once and the cells copy its style ids.
+    kind_styles = {
+        '#': {'font': BOLD_FONT, 'alignment': _CENTER_ALIGNED},
+        'estudiant': {'font': BOLD_FONT, 'alignment': LEFT_ALIGNED},
+        'grade': {'alignment': _CENTER_ALIGNED},
+    }
+    column_styles = []
+    for col_idx, col_name in enumerate(summary_df.columns, 1):
+        styles = dict(kind_styles[column_kinds[col_idx]])
+        # MP grade columns also carry their number format: 2 decimal places for
+        # Type A and integers for Type B.
+        mp_info = mp_info_by_column.get(col_name)
+        if mp_info:
+            styles['number_format'] = '0.00' if mp_info['type_a'] else '0'
+        column_styles.append(styles)
+    even_row_styles, odd_row_styles = (
+        [
+            style_template(ws, border=THIN_BORDER, fill=row_fill, **styles)
+            for styles in column_styles
+        ]
+        for row_fill in (light_green, dark_green)
+    )
+
+    # First, apply all existing formatting
+    data_rows = ws.iter_rows(min_row=2, max_row=last_row, max_col=len(column_kinds))
+    for row_idx, row in enumerate(data_rows, 2):
+        row_styles = even_row_styles if (row_idx % 2 == 0) else odd_row_styles
+        for cell, style in zip(row, row_styles):
+            apply_style_template(cell, style)
+    
+    # Conditional formatting turns the summary into a working checklist by calling
+    # attention to missing values, special markers, and grades below the threshold.
+    # Add conditional formatting to highlight empty or non-numeric cells in red
+    red_fill = _solid_fill("FFCCCC")
+    
+    # New fill for specific strings
+    orange_fill = _solid_fill("FFE6CC")
+
+    # Define red font for numbers < 5
+    red_font = _RED_FONT
+
+    # Columns sharing a failing threshold get the same three rules, so each rule is added
+    # once over a multi-range of those columns instead of once per column.
+    ranges_by_threshold: dict[float, list[str]] = {}
+    # Without student rows the ranges below would end above their first row.
+    conditional_columns = enumerate(summary_df.columns, 1) if last_row > 1 else []
+    for col_idx, col_name in conditional_columns:
+        # IMPORTANT: Skip the first two columns ('#' and 'estudiant') for conditional formatting
+        if col_name.lower() == 'estudiant' or col_name == '#':
+            continue
+
+        # Determine the threshold for red text based on column name
+        threshold = 4.5 if col_name.endswith('CENTRE') else 5
+        col_letter = column_letters[col_idx]
+        ranges_by_threshold.setdefault(threshold, []).append(f"{col_letter}2:{col_letter}{last_row}")
+
+    for threshold, column_ranges in ranges_by_threshold.items():
+        range_str = " ".join(column_ranges)
+        # The formulas reference the top-left cell of the first (leftmost) range; Excel
+        # shifts that relative reference for every other cell the rule covers.
+        first_cell = column_ranges[0].split(':', 1)[0]
+
+        # Add conditional formatting rule for cells containing specific strings (PDT, EP, PQ)
+        # This rule should be applied *before* the general non-numeric/empty rule
+        # because conditional formatting rules are applied in the order they are added.
+        # The stopIfTrue=True ensures that if this rule applies, the next rule is not checked.
+        ws.conditional_formatting.add(
+            range_str,
+            FormulaRule(
+                formula=[
+                    f'OR(UPPER({first_cell})="PDT", '
+                    f'UPPER({first_cell})="EP", '
+                    f'UPPER({first_cell})="PQ")'
+                ],
+                stopIfTrue=True,
+                fill=orange_fill
             )
+        )
 
-            # Add conditional formatting rule for numerical values smaller than the determined threshold
-            ws.conditional_formatting.add(
-                range_str,
-                FormulaRule(
-                    formula=[f'AND(ISNUMBER({col_letter}2), {col_letter}2<{threshold})'],
-                    font=red_font
-                )
+        # Add conditional formatting rule for empty cells or non-numeric values
+        ws.conditional_formatting.add(
+            range_str,
+            FormulaRule(
+                formula=[f'OR(ISBLANK({first_cell}), NOT(ISNUMBER({first_cell})))'],
+                stopIfTrue=True,
+                fill=red_fill
             )
-
-        # Auto-adjust column widths
-        for col_idx, column_name in enumerate(summary_df.columns, 1):
-            column_letter = get_column_letter(col_idx)
-            max_length = 0
-            if column_name:
-                max_length = max(max_length, len(str(column_name)))
-            for i in range(1, ws.max_row + 1):
-                if ws.cell(row=i, column=col_idx).value is not None:
-                    max_length = max(max_length, len(str(ws.cell(row=i, column=col_idx).value)))
-            adjusted_width = (max_length + 2) if max_length > 0 else len(str(column_name)) + 2
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Add the grading legend directly in the summary so printed copies still explain
-        # the different MP color meanings without needing the detailed workbook.
-        # Add legend at the bottom of the sheet
-        legend_start_row = ws.max_row + 2  # Leave one empty row after the data
-
-        # Create a bold font and border for the legend
-        bold_font = Font(bold=True)
-        centered_wrap = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_wrap = Alignment(horizontal='left', vertical='center', wrap_text=True)
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
         )
 
-        legend_entries = [
-            ("F1C232", "MP amb estada a l'empresa\nNOTA PONDERADA AL 90% amb 2 decimals"),
-            ("B4A7D6", "MP sense estada a l'empresa\nNOTA SOBRE 10 i sense decimals"),
-        ]
-
-        for i, (color, text) in enumerate(legend_entries):
-            row = legend_start_row + i
-            color_cell = ws.cell(row=row, column=1)
-            label_cell = ws.cell(row=row, column=2, value=text)
-
-            # Apply styles
-            color_cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-            color_cell.border = thin_border
-            color_cell.alignment = centered_wrap
-
-            label_cell.fill = PatternFill(fill_type=None)  # No background color
-            label_cell.font = bold_font
-            label_cell.border = thin_border
-            label_cell.alignment = left_wrap
-
-            # Set row height for visibility
-            ws.row_dimensions[row].height = 45
-
-        # Adjust column widths for legend
-        ws.column_dimensions['A'].width = 5
-        ws.column_dimensions['B'].width = 50
-
-
-        # Apply borders to legend cells
-        for row in range(legend_start_row, legend_start_row + 2):
-            for col in [1, 2]:
-                cell = ws.cell(row=row, column=col)
-                cell.border = thin_border
-                cell.font = bold_font  # Ensure all legend text is bold
-
-        wb.save(output_summary_path)
+        # Add conditional formatting rule for numerical values smaller than the determined threshold
+        ws.conditional_formatting.add(
+            range_str,
+            FormulaRule(
+                formula=[f'AND(ISNUMBER({first_cell}), {first_cell}<{threshold})'],
+                font=red_font
+            )
+        )
 
-    except Exception as e:
-        # Clean up partially created file if error occurs during writing/formatting
-        if os.path.exists(output_summary_path):
-            try:
-                os.remove(output_summary_path)
-            except Exception as remove_e:
-                print(f"[ERROR summary_generator] Could not remove partial file {output_summary_path}: {remove_e}")
-        print(f"[ERROR summary_generator] Error writing or formatting summary file {output_summary_path}: {e}")
+    # Auto-adjust column widths
+    column_values = ws.iter_cols(min_row=1, max_row=last_row, max_col=len(summary_df.columns), values_only=True)
+    for col_idx, (column_name, values) in enumerate(zip(summary_df.columns, column_values), 1):
+        column_letter = column_letters[col_idx]
+        max_length = 0
+        if column_name:
+            max_length = max(max_length, len(str(column_name)))
+        for value in values:
+            if value is not None:
+                max_length = max(max_length, len(str(value)))
+        adjusted_width = (max_length + 2) if max_length > 0 else len(str(column_name)) + 2
+        ws.column_dimensions[column_letter].width = adjusted_width
+
+    # Add the grading legend directly in the summary so printed copies still explain
+    # the different MP color meanings without needing the detailed workbook.
+    # Add legend at the bottom of the sheet
+    legend_start_row = last_row + 2  # Leave one empty row after the data
+
+    legend_entries = [
+        ("F1C232", "MP amb estada a l'empresa\nNOTA PONDERADA AL 90% amb 2 decimals"),
+        ("B4A7D6", "MP sense estada a l'empresa\nNOTA SOBRE 10 i sense decimals"),
+    ]
+
+    for i, (color, text) in enumerate(legend_entries):
+        row = legend_start_row + i
+        color_cell = ws.cell(row=row, column=1)
+        label_cell = ws.cell(row=row, column=2, value=text)
+
+        # Apply styles
+        color_cell.fill = _solid_fill(color)
+        color_cell.font = BOLD_FONT  # Ensure all legend text is bold
+        color_cell.border = THIN_BORDER
+        color_cell.alignment = CENTER_WRAPPED
+
+        label_cell.fill = NO_FILL  # No background color
+        label_cell.font = BOLD_FONT
+        label_cell.border = THIN_BORDER
+        label_cell.alignment = LEFT_WRAPPED
+
+        # Set row height for visibility
+        ws.row_dimensions[row].height = 45
+
+    # Adjust column widths for legend
+    ws.column_dimensions['A'].width = 5
+    ws.column_dimensions['B'].width = 50
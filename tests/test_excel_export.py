@@ -37,7 +37,12 @@ def test_export_excel_with_spacing_creates_expected_public_safe_workbook(tmp_pat
 
     assert worksheet["B5"].value == "MP amb estada a l'empresa"
     assert worksheet["B6"].value == "MP sense estada a l'empresa"
-    assert len(worksheet.conditional_formatting) >= 7
+    conditional_formats = list(worksheet.conditional_formatting)
+    assert len(conditional_formats) == 1
+    assert len(conditional_formats[0].rules) == 3
+    assert {cell_range.coord for cell_range in conditional_formats[0].sqref.ranges} == {
+        f"{column}2:{column}3" for column in "CDEFGHI"
+    }
 
 
 def test_export_excel_output_can_be_reopened_after_write(tmp_path: Path, export_case) -> None:
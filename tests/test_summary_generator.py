@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from openpyxl import Workbook, load_workbook
+
+from src.summary_generator import _read_source_sheet, generate_summary_report
+
+SOURCE_HEADER = ["#", "ESTUDIANT", "MP01_CF01_1RA", "MP01 CENTRE", "MP01 EMPRESA", "MP01", None, "MP02"]
+
+
+def _write_source_workbook(path: Path, rows: list[list[object]]) -> None:
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(SOURCE_HEADER)
+    for row in rows:
+        worksheet.append(row)
+    workbook.save(path)
+
+
+def _sheet_ranges(worksheet) -> list:
+    ranges = [cell_range for rule in worksheet.conditional_formatting for cell_range in rule.sqref.ranges]
+    ranges += [
+        cell_range
+        for validation in worksheet.data_validations.dataValidation
+        for cell_range in validation.sqref.ranges
+    ]
+    return ranges
+
+
+def test_read_source_sheet_names_blank_headers_like_pandas(tmp_path: Path) -> None:
+    source_path = tmp_path / "source.xlsx"
+    _write_source_workbook(source_path, [[1, "Alice Example", 7, 8.25, 9, 8, "note", 6]])
+
+    source = _read_source_sheet(str(source_path))
+
+    assert source.columns.tolist() == [
+        "#", "ESTUDIANT", "MP01_CF01_1RA", "MP01 CENTRE", "MP01 EMPRESA", "MP01", "Unnamed: 6", "MP02",
+    ]
+    assert source.iloc[0].tolist() == [1, "Alice Example", 7, 8.25, 9, 8, "note", 6]
+
+
+def test_generate_summary_report_keeps_final_mp_columns_and_stops_at_first_empty_row(tmp_path: Path) -> None:
+    source_path = tmp_path / "source.xlsx"
+    summary_path = tmp_path / "summary.xlsx"
+    _write_source_workbook(
+        source_path,
+        [
+            [1, "Alice Example", 7, 8.25, 9, 8, "note", 6],
+            [2, "Bob Example", 4, 3.5, 5, 4, None, "PDT"],
+            [],
+            [None, "MP amb estada a l'empresa"],
+        ],
+    )
+
+    generate_summary_report(str(source_path), str(summary_path))
+
+    worksheet = load_workbook(summary_path).active
+    rows = list(worksheet.iter_rows(max_row=4, values_only=True))
+    assert rows == [
+        ("#", "ESTUDIANT", "MP01 CENTRE", "MP02"),
+        (1, "Alice Example", 8.25, 6),
+        (2, "Bob Example", 3.5, "PDT"),
+        (None, None, None, None),
+    ]
+    assert worksheet["B5"].value.startswith("MP amb estada a l'empresa\n")
+    assert {cell_range.coord for cell_range in _sheet_ranges(worksheet)} >= {"C2:C3", "D2:D3"}
+
+
+def test_generate_summary_report_handles_source_without_student_rows(tmp_path: Path) -> None:
+    source_path = tmp_path / "empty-source.xlsx"
+    summary_path = tmp_path / "empty-summary.xlsx"
+    _write_source_workbook(source_path, [[], [None, "MP amb estada a l'empresa"]])
+
+    generate_summary_report(str(source_path), str(summary_path))
+
+    worksheet = load_workbook(summary_path).active
+    assert [cell.value for cell in worksheet[1]] == ["#", "ESTUDIANT", "MP01 CENTRE", "MP02"]
+    assert worksheet["A2"].value is None
+    assert worksheet["B3"].value.startswith("MP amb estada a l'empresa\n")
+    assert len(worksheet.conditional_formatting) == 0
+    assert all(cell_range.min_row <= cell_range.max_row for cell_range in _sheet_ranges(worksheet))